@@ -202,6 +202,19 @@ class MergedIteratorState:
         state[latest_worker_id] = new_state
         self.latest_worker_id = latest_worker_id
 
+    def snapshot(self) -> "MergedIteratorState":
+        """Returns a copy of this state which won't be affected by future updates.
+
+        The frozen ``IteratorState`` entries are shared with the copy, only the containers mapping to them are copied.
+        """
+        if self.represent_map_dataset:
+            state = dict(self.state)
+        else:
+            state = {generator_name: dict(worker_states) for generator_name, worker_states in self.state.items()}
+        return MergedIteratorState(
+            state=state, latest_worker_id=self.latest_worker_id, represent_map_dataset=self.represent_map_dataset
+        )
+
     @property
     def sampler_states(self) -> Dict[int, Any]:
         """Returns the merged sampler states for all worker processes."""
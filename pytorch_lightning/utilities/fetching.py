@@ -12,16 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dataclasses
 from abc import ABC, abstractmethod
-from collections.abc import Iterable, Iterator
-from copy import deepcopy
-from typing import Any, Callable, List, Optional, Tuple
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import Any, Callable, Deque, List, Optional, Tuple
 
+import numpy as np
 import torch
-from torch.utils.data.dataloader import DataLoader
+from torch.utils.data.dataloader import DataLoader, default_collate
+from torch.utils.data.dataset import IterableDataset
 
 from pytorch_lightning.trainer.supporters import CombinedLoader, CycleIterator
-from pytorch_lightning.utilities.apply_func import apply_to_collection, apply_to_collections
+from pytorch_lightning.utilities.apply_func import _is_dataclass_instance, apply_to_collection, apply_to_collections
 from pytorch_lightning.utilities.auto_restart import (
     _add_capture_metadata_collate,
     _patch_dataloader_get_iterators,
@@ -30,8 +35,30 @@ from pytorch_lightning.utilities.auto_restart import (
     MergedIteratorState,
     patch_dataloader_iterator,
 )
+from pytorch_lightning.utilities.enums import _FaultTolerantMode
 from pytorch_lightning.utilities.exceptions import MisconfigurationException
-from pytorch_lightning.utilities.imports import _fault_tolerant_training
+from pytorch_lightning.utilities.imports import _fault_tolerant_training, _TORCH_GREATER_EQUAL_2_0
+
+
+def _flat_loader_iter_pairs(loaders: Any, loader_iters: Any) -> Optional[List[Tuple[Any, Iterator]]]:
+    """Pairs the loaders with their iterators when they are held in a flat collection, so the generic collection
+    traversal can be skipped.
+
+    Returns ``None`` when the collections are nested.
+    """
+    if isinstance(loaders, Mapping):
+        if loaders.keys() != loader_iters.keys():
+            return None
+        pairs = [(loaders[k], loader_iters[k]) for k in loaders]
+    elif isinstance(loaders, Sequence):
+        if len(loaders) != len(loader_iters):
+            return None
+        pairs = list(zip(loaders, loader_iters))
+    else:
+        pairs = [(loaders, loader_iters)]
+    if all(isinstance(loader, (DataLoader, CycleIterator)) for loader, _ in pairs):
+        return pairs
+    return None
 
 
 class AbstractDataFetcher(ABC):
@@ -50,6 +77,19 @@ class AbstractDataFetcher(ABC):
                         return None, True
     """
 
+    # avoids the instance dictionary as the attributes are accessed for every batch.
+    __slots__ = (
+        "prefetch_batches",
+        "_dataloader",
+        "dataloader_iter",
+        "fetched",
+        "done",
+        "_ft_enabled",
+        "_loaders_cache",
+        "_loader_iters_cache",
+        "_state_iters",
+    )
+
     @abstractmethod
     def fetching_function(self) -> Any:
         """Override with your own fetching logic."""
@@ -75,10 +115,15 @@ class AbstractDataFetcher(ABC):
         self.dataloader_iter: Optional[Iterator] = None
         self.fetched: int = 0
         self.done: bool = False
+        self._ft_enabled: bool = _fault_tolerant_training()
+        self._loaders_cache: Optional[List[DataLoader]] = None
+        self._loader_iters_cache: Optional[Tuple[int, List[Iterator]]] = None
+        self._state_iters: List[Iterator] = []
 
     def setup(self, dataloader: Iterable, **kwargs: Any) -> None:
         self._add_capture_metadata_collate(dataloader)
         self._dataloader = dataloader
+        self._clear_loaders_cache()
 
     @property
     def dataloader(self) -> Iterable:
@@ -90,92 +135,139 @@ class AbstractDataFetcher(ABC):
 
     @staticmethod
     def _add_capture_metadata_collate(dataloader: Iterable) -> None:
-        if not isinstance(dataloader, (DataLoader, CombinedLoader)):
+        if not _fault_tolerant_training():
             return
 
-        if isinstance(dataloader, CombinedLoader):
-            dataloader = dataloader.loaders
+        if isinstance(dataloader, DataLoader):
+            _add_capture_metadata_collate(dataloader)
+        elif isinstance(dataloader, CombinedLoader):
+            apply_to_collection(dataloader.loaders, DataLoader, _add_capture_metadata_collate)
 
-        apply_to_collection(dataloader, DataLoader, _add_capture_metadata_collate)
+    def _setup_iterators_and_patch(self) -> None:
+        if self._ft_enabled and _FaultTolerantMode.detect_current_mode().is_manual:
+            # the stateful iterators require the data fetcher to be attached before their creation.
+            self._attach_data_fetcher()
+        _patch_dataloader_get_iterators()
+        self.dataloader_iter = iter(self.dataloader)
+        self._clear_loaders_cache()
+        # attaches the data fetcher and patches the iterators within a single traversal.
+        self._apply_patch()
 
     def _apply_patch(self) -> None:
+        if not self._ft_enabled:
+            return
+
         def _apply_patch_fn(loader: DataLoader, iterator: Iterator) -> None:
+            # keep track of the iterators holding a state, so it can be collected without traversing the collection.
+            self._state_iters.append(iterator)
             if isinstance(loader, CycleIterator):
                 loader = loader.loader
                 # cycle_iterator = iterator
                 iterator = iterator._loader_iter
 
-            if isinstance(loader, DataLoader) and _fault_tolerant_training():
+            if isinstance(loader, DataLoader):
                 loader._lightning_fetcher = self
                 patch_dataloader_iterator(loader, iterator, self)
 
-        apply_to_collections(self.loaders, self.loader_iters, (Iterator, DataLoader), _apply_patch_fn)
+        loaders, loader_iters = self.loaders, self.loader_iters
+        pairs = _flat_loader_iter_pairs(loaders, loader_iters)
+        if pairs is None:
+            apply_to_collections(loaders, loader_iters, (Iterator, DataLoader), _apply_patch_fn)
+            return
+        for loader, iterator in pairs:
+            _apply_patch_fn(loader, iterator)
 
     def _store_dataloader_iter_state(
         self, dataloader_iter: Iterator, dataloader_iter_states: List[IteratorState]
     ) -> None:
-        if getattr(dataloader_iter, "cache_states", None) is None:
-            dataloader_iter.cache_states = {}
+        if not self._ft_enabled:
+            return
+
+        cache_states = getattr(dataloader_iter, "cache_states", None)
+        if cache_states is None:
+            # one queue per iterator name, created upfront for the names known from the first states.
+            cache_states = dataloader_iter.cache_states = {s.name: deque() for s in dataloader_iter_states}
 
-        if getattr(dataloader_iter, "state", None) is None:
-            dataloader_iter.state = MergedIteratorState()
+        merged_state = getattr(dataloader_iter, "state", None)
+        if merged_state is None:
+            merged_state = dataloader_iter.state = MergedIteratorState()
 
+        queues = []
         for iter_state in dataloader_iter_states:
-            iter_name = iter_state.name
-            if iter_name not in dataloader_iter.cache_states:
-                dataloader_iter.cache_states[iter_name] = []
-            dataloader_iter.cache_states[iter_name].append(iter_state)
+            queue = cache_states.get(iter_state.name)
+            if queue is None:
+                queue = cache_states[iter_state.name] = deque()
+            queue.append(iter_state)
+            queues.append(queue)
 
         if self.fetched >= self.prefetch_batches:
-            for iter_state in dataloader_iter_states:
-                if len(dataloader_iter.state):
-                    dataloader_iter.previous_state = deepcopy(dataloader_iter.state)
-                iter_name = iter_state.name
-                state = dataloader_iter.cache_states[iter_name].pop(0)
-                dataloader_iter.state.update(iter_name, state)
+            for iter_state, queue in zip(dataloader_iter_states, queues):
+                if len(merged_state):
+                    dataloader_iter.previous_state = merged_state.snapshot()
+                merged_state.update(iter_state.name, queue.popleft())
 
     @property
     def loaders(self) -> List[DataLoader]:
-        if isinstance(self.dataloader, CombinedLoader):
-            loaders = self.dataloader.loaders
-        else:
-            loaders = [self.dataloader]
-        return loaders
+        if self._loaders_cache is None:
+            if isinstance(self.dataloader, CombinedLoader):
+                self._loaders_cache = self.dataloader.loaders
+            else:
+                self._loaders_cache = [self.dataloader]
+        return self._loaders_cache
 
     @property
     def loader_iters(self) -> List[Iterator]:
         if self.dataloader_iter is None:
             raise MisconfigurationException("The `dataloader_iter` isn't available outside the __iter__ context.")
 
-        if isinstance(self.dataloader, CombinedLoader):
-            loader_iters = self.dataloader_iter.loader_iters
-        else:
-            loader_iters = [self.dataloader_iter]
-        return loader_iters
+        # the cache is keyed on the iterator to never return the loader iterators of a previous one.
+        key = id(self.dataloader_iter)
+        if self._loader_iters_cache is None or self._loader_iters_cache[0] != key:
+            if isinstance(self.dataloader, CombinedLoader):
+                loader_iters = self.dataloader_iter.loader_iters
+            else:
+                loader_iters = [self.dataloader_iter]
+            self._loader_iters_cache = (key, loader_iters)
+        return self._loader_iters_cache[1]
+
+    def _clear_loaders_cache(self) -> None:
+        self._loaders_cache = None
+        self._loader_iters_cache = None
 
     @property
     def state(self) -> List[MergedIteratorState]:
-        def collect_state(iterator: Iterator) -> MergedIteratorState:
-            return iterator.state
+        if self.dataloader_iter is None:
+            raise MisconfigurationException("The `dataloader_iter` isn't available outside the __iter__ context.")
+        if not self._ft_enabled:
+            # the iterators hold a state only once patched, which requires fault tolerant training.
+            raise MisconfigurationException("The `state` is only available with fault tolerant training.")
 
-        return apply_to_collection(self.loader_iters, Iterator, collect_state)
+        if isinstance(self.dataloader, CombinedLoader):
+
+            def collect_state(iterator: Iterator) -> MergedIteratorState:
+                return iterator.state
+
+            # the states are returned with the same structure as the combined loader iterators.
+            return apply_to_collection(self.loader_iters, Iterator, collect_state)
+
+        return [iterator.state for iterator in self._state_iters]
 
     def _attach_data_fetcher(self) -> None:
+        if not self._ft_enabled:
+            return
+
         def _attach_data_fetcher_fn(loader: DataLoader) -> None:
             if isinstance(loader, CycleIterator):
                 loader = loader.loader
 
-            if isinstance(loader, DataLoader) and _fault_tolerant_training():
+            if isinstance(loader, DataLoader):
                 loader._lightning_fetcher = self
 
         apply_to_collection(self.loaders, (DataLoader, CycleIterator), _attach_data_fetcher_fn)
 
     def __iter__(self) -> "AbstractDataFetcher":
         self.reset()
-        self._attach_data_fetcher()
-        _patch_dataloader_get_iterators()
-        self.dataloader_iter = iter(self.dataloader)
-        self._apply_patch()
+        self._setup_iterators_and_patch()
         self.prefetching()
         return self
 
@@ -185,6 +277,8 @@ class AbstractDataFetcher(ABC):
     def reset(self) -> None:
         self.fetched = 0
         self.done = False
+        self._clear_loaders_cache()
+        self._state_iters = []
 
     def teardown(self) -> None:
         self.reset()
@@ -200,6 +294,177 @@ def _no_op_batch_to_device(batch: Any) -> Any:
     return batch
 
 
+# batches whose tensors are smaller than this in total are eligible to be moved to device with a single copy.
+_COALESCE_MAX_BYTES = 4 * 1024 * 1024
+
+
+def _collect_tensors(data: Any, tensors: List[torch.Tensor]) -> None:
+    """Collects the tensors of a collection in the order ``apply_to_collection`` visits them, without rebuilding
+    the collection."""
+    if isinstance(data, torch.Tensor):
+        tensors.append(data)
+    elif isinstance(data, Mapping):
+        for value in data.values():
+            _collect_tensors(value, tensors)
+    elif isinstance(data, Sequence) and not isinstance(data, str):
+        for value in data:
+            _collect_tensors(value, tensors)
+    elif _is_dataclass_instance(data):
+        # only the fields set in `__init__` are mapped by `apply_to_collection`.
+        for field in dataclasses.fields(data):
+            if field.init:
+                _collect_tensors(getattr(data, field.name), tensors)
+
+
+def _coalesced_to_device(batch: Any, device: torch.device) -> Any:
+    """Moves the tensors of a batch to the device with a single copy by gathering them into one contiguous buffer.
+
+    The batch is returned unchanged if the device is the CPU, or if its tensors don't share the same dtype, aren't on
+    CPU, or are too large to benefit from it.
+    """
+    if device.type == "cpu":
+        return batch
+    tensors: List[torch.Tensor] = []
+    _collect_tensors(batch, tensors)
+    if len(tensors) < 2:
+        return batch
+    dtype = tensors[0].dtype
+    if any(t.dtype != dtype or t.device.type != "cpu" for t in tensors):
+        return batch
+    numels = [t.numel() for t in tensors]
+    if sum(numels) * tensors[0].element_size() > _COALESCE_MAX_BYTES:
+        return batch
+
+    # a pinned buffer makes the copy asynchronous
+    buffer = torch.empty(sum(numels), dtype=dtype, pin_memory=device.type == "cuda")
+    torch.cat([t.reshape(-1) for t in tensors], out=buffer)
+    chunks = iter(buffer.to(device, non_blocking=True).split(numels))
+    return apply_to_collection(batch, torch.Tensor, lambda t: next(chunks).view_as(t))
+
+
+# marks the single pre-fetched batch slot of the ``DataFetcher`` as empty, ``None`` being a valid batch.
+_EMPTY_SLOT = object()
+
+
+def _pin_tensor(tensor: torch.Tensor) -> torch.Tensor:
+    if tensor.is_cuda or tensor.is_pinned():
+        return tensor
+    return tensor.pin_memory()
+
+
+def _pin_memory(batch: Any) -> Any:
+    return apply_to_collection(batch, torch.Tensor, _pin_tensor)
+
+
+def _mmap_batches_dataloader(dataloader: Iterable) -> Optional[DataLoader]:
+    """Returns the ``DataLoader`` whose batches can be sliced from the dataset directly, the dataset exposing a
+    duck-typed ``__mmap_batch__(indices)`` method and the dataloader neither using workers nor a custom collate
+    function.
+
+    A ``CombinedLoader`` is only supported when it wraps a single ``DataLoader``, as done by the Trainer for the
+    training dataloader.
+    """
+    if isinstance(dataloader, CombinedLoader):
+        dataloader = dataloader.loaders
+    if not isinstance(dataloader, DataLoader):
+        return None
+    dataset = dataloader.dataset
+    if (
+        dataloader.num_workers == 0
+        and dataloader.batch_sampler is not None
+        and dataloader.collate_fn is default_collate
+        and not dataloader.pin_memory
+        # the batch sampler of an iterable dataset yields `None` indices forever
+        and not isinstance(dataset, IterableDataset)
+        and callable(getattr(dataset, "__mmap_batch__", None))
+    ):
+        return dataloader
+    return None
+
+
+class _MmapBatchIterator(Iterator):
+
+    """This class fetches the batches of a dataset backed by a memory-mapped array or tensor by slicing it
+    directly with the indices of the batch sampler, skipping the per-sample indexing and the collate function."""
+
+    def __init__(self, dataloader: DataLoader) -> None:
+        batch_sampler = dataloader.batch_sampler
+        assert batch_sampler is not None
+        self.dataset = dataloader.dataset
+        self.sampler_iter = iter(batch_sampler)
+
+    def __next__(self) -> Any:
+        batch = self.dataset.__mmap_batch__(next(self.sampler_iter))
+        # `torch.from_numpy` shares the memory with the array, no copy is made.
+        return apply_to_collection(batch, np.ndarray, torch.from_numpy)
+
+
+def _record_stream(tensor: torch.Tensor, stream: torch.cuda.Stream) -> torch.Tensor:
+    # prevents the caching allocator from re-using the memory before the work queued on `stream` is done.
+    if tensor.is_cuda:
+        tensor.record_stream(stream)
+    return tensor
+
+
+class _ThreadedPrefetch(Iterator):
+
+    """This class wraps an iterator and consumes it from a daemon thread, buffering up to ``maxsize`` items in a
+    queue so that producing the next item overlaps with the work done by the consumer. The optional ``transform`` is
+    applied to each item from the thread."""
+
+    _SENTINEL = object()
+
+    def __init__(self, iterator: Iterator, maxsize: int = 1, transform: Optional[Callable[[Any], Any]] = None) -> None:
+        self.iterator = iterator
+        self.transform = transform
+        self._queue: Queue = Queue(maxsize=maxsize)
+        self._stop_event = Event()
+        self._exception: Optional[BaseException] = None
+        self._exhausted = False
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        # use a timeout so the thread can't stay blocked on a full queue once `close` has been called.
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        try:
+            for item in self.iterator:
+                if self.transform is not None:
+                    item = self.transform(item)
+                if not self._put(item):
+                    return
+        except Exception as e:
+            # the exception is re-raised in the consumer thread.
+            self._exception = e
+        self._put(self._SENTINEL)
+
+    def __next__(self) -> Any:
+        if self._exhausted:
+            raise StopIteration
+        item = self._queue.get()
+        if item is self._SENTINEL:
+            self._exhausted = True
+            if self._exception is not None:
+                raise self._exception
+            raise StopIteration
+        return item
+
+    def close(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+        # release the references to the remaining items, later calls to `__next__` raise `StopIteration`.
+        self._queue = Queue()
+        self._exhausted = True
+
+
 class DataFetcher(AbstractDataFetcher):
 
     """This class is used to control batch fetching flow. By default, the ``fetching_function`` will pre-fetch a
@@ -209,30 +474,117 @@ class DataFetcher(AbstractDataFetcher):
         prefetch_batches: Number of batches to be pre-fetched. Lightning will pre-fetch
             at least 1 batch for tracking the latest batch.
         store_on_device: Whether to store the pre-fetched batches on device.
+        background: Whether to pull the batches from the dataloader iterator in a background thread, so that
+            fetching the next batches overlaps with the training step.
+        use_copy_stream: Whether to move the batches to device on a dedicated CUDA stream as soon as they are
+            pre-fetched, so that the copy overlaps with the training step queued on the current stream. Only used
+            when CUDA is available.
+        coalesce_small_tensors: Whether to move the tensors of small batches to ``device`` with a single copy
+            instead of one per tensor. The batch is then already on device when passed to ``batch_to_device``.
+        device: The device to move the coalesced tensors to. Required when ``coalesce_small_tensors=True``.
+        pin_memory: Whether to copy the fetched tensors into pinned memory when the dataloader didn't, so that they
+            can be moved asynchronously to the GPU. Only used when CUDA is available.
+        compile_batch_to_device: Whether to compile the ``batch_to_device`` function with ``torch.compile`` to reduce
+            its Python overhead. Requires PyTorch 2.0 or later.
+
+    Note:
+        When the dataset implements a ``__mmap_batch__(indices)`` method returning a whole batch, e.g. by slicing a
+        memory-mapped array, and the dataloader uses neither workers nor a custom ``collate_fn``, the batches are
+        fetched through this method directly. A ``CombinedLoader`` is only supported when it wraps a single
+        ``DataLoader``.
     """
 
-    def __init__(self, prefetch_batches: int = 1, store_on_device: bool = True) -> None:
+    __slots__ = (
+        "store_on_device",
+        "background",
+        "coalesce_small_tensors",
+        "pin_memory",
+        "compile_batch_to_device",
+        "device",
+        "batch_to_device",
+        "batches",
+        "_single_slot",
+        "_next_batch",
+        "_background_iter",
+        "_fetch_iter",
+        "_mmap_dataloader",
+        "copy_stream",
+    )
+
+    def __init__(
+        self,
+        prefetch_batches: int = 1,
+        store_on_device: bool = True,
+        background: bool = False,
+        use_copy_stream: bool = False,
+        coalesce_small_tensors: bool = False,
+        device: Optional[torch.device] = None,
+        pin_memory: bool = False,
+        compile_batch_to_device: bool = False,
+    ) -> None:
         if prefetch_batches < 1:
             raise MisconfigurationException("`prefetch_batches` should at least be 1.")
+        if compile_batch_to_device and not _TORCH_GREATER_EQUAL_2_0:
+            raise MisconfigurationException(
+                "`DataFetcher(compile_batch_to_device=True)` requires PyTorch 2.0 or later."
+            )
+        if coalesce_small_tensors and device is None:
+            raise MisconfigurationException("`DataFetcher(coalesce_small_tensors=True)` requires a `device`.")
         super().__init__(prefetch_batches=prefetch_batches)
+        if background and self._ft_enabled:
+            raise MisconfigurationException(
+                "`DataFetcher(background=True)` isn't supported with fault tolerant training."
+            )
         self.store_on_device = store_on_device
+        self.background = background
+        self.coalesce_small_tensors = coalesce_small_tensors
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self.compile_batch_to_device = compile_batch_to_device
+        self.device = torch.device(device) if device is not None else None
         self.batch_to_device: Callable[[Any], Any] = _no_op_batch_to_device
-        self.batches: List[Any] = []
+        self.batches: Deque[Any] = deque()
+        # with a single pre-fetched batch, it is stored in a slot instead of the `batches` queue. Subclasses may read or
+        # fill the queue from any hook, so they keep relying on it.
+        self._single_slot = prefetch_batches == 1 and type(self) is DataFetcher
+        self._next_batch: Any = _EMPTY_SLOT
+        self._background_iter: Optional[_ThreadedPrefetch] = None
+        # the iterator the batches are fetched from, either the dataloader iterator or the background one.
+        self._fetch_iter: Optional[Iterator] = None
+        self._mmap_dataloader: Optional[DataLoader] = None
+        self.copy_stream: Optional[torch.cuda.Stream] = None
+        if use_copy_stream and store_on_device and torch.cuda.is_available():
+            self.copy_stream = torch.cuda.Stream()
 
     def setup(  # type: ignore[override]
         self, dataloader: Iterable, batch_to_device: Optional[Callable[[Any], Any]] = None
     ) -> None:
         super().setup(dataloader)
+        # the fault tolerant logic relies on the dataloader iterator to capture the states.
+        self._mmap_dataloader = None if self._ft_enabled else _mmap_batches_dataloader(dataloader)
         if batch_to_device is not None:
+            if self.compile_batch_to_device:
+                batch_to_device = torch.compile(batch_to_device, dynamic=False, fullgraph=False)
             self.batch_to_device = batch_to_device
 
     def on_fetch_end(self, batch: Any, start_output: Any) -> None:
         """Hook to extend which handles the logic after fetching a batch."""
-        self.batches.append(batch)
+        if self._single_slot:
+            self._next_batch = batch
+        else:
+            self.batches.append(batch)
 
     def prefetching(self) -> None:
         iterator = self.dataloader_iter
         assert iterator is not None
+        if self._mmap_dataloader is not None:
+            iterator = _MmapBatchIterator(self._mmap_dataloader)
+        if self.background:
+            # the batches get pinned from the background thread too.
+            transform = _pin_memory if self.pin_memory else None
+            iterator = self._background_iter = _ThreadedPrefetch(
+                iterator, maxsize=self.prefetch_batches, transform=transform
+            )
+        self._fetch_iter = iterator
         for _ in range(self.prefetch_batches):
             try:
                 self._fetch_next_batch(iterator)
@@ -240,34 +592,75 @@ class DataFetcher(AbstractDataFetcher):
                 break
 
     def fetching_function(self) -> Tuple[Any, bool]:
-        if self.batches:
-            batch = self.batches.pop(0)
-        else:
+        batch = self._pop_batch()
+        if batch is _EMPTY_SLOT:
             # empty iterator, no prefetching done
             raise StopIteration
+        # the transfer is issued before fetching the next batch, so an asynchronous copy overlaps with it.
+        batch = self.move_to_device(batch)
+        # wait for the returned batch only, the copy of the next one being issued afterwards.
+        self.wait()
         if not self.done:
-            assert self.dataloader_iter is not None
             try:
-                self._fetch_next_batch(self.dataloader_iter)
+                self._fetch_next_batch(self._fetch_iter)  # type: ignore[arg-type]
             except StopIteration:
                 self.done = True
-        self.wait()
-        return self.move_to_device(batch), len(self.batches) == 0
+        return batch, not self._has_batches()
+
+    def _pop_batch(self) -> Any:
+        if self._single_slot:
+            batch, self._next_batch = self._next_batch, _EMPTY_SLOT
+            return batch
+        return self.batches.popleft() if self.batches else _EMPTY_SLOT
+
+    def _has_batches(self) -> bool:
+        if self._single_slot:
+            return self._next_batch is not _EMPTY_SLOT
+        return bool(self.batches)
 
     def _fetch_next_batch(self, iterator: Iterator) -> None:
         start_output = self.on_fetch_start()
         batch = next(iterator)
+        if self.pin_memory and not self.background:
+            batch = _pin_memory(batch)
+        if self.copy_stream is not None:
+            batch = self._copy_to_device(batch)
         self.fetched += 1
         self.on_fetch_end(batch, start_output)
 
     def move_to_device(self, batch: Any) -> Any:
-        if self.store_on_device:
-            batch = self.batch_to_device(batch)
+        # with a copy stream, the batches are moved to device when they are pre-fetched.
+        if self.store_on_device and self.copy_stream is None:
+            return self._transfer_batch(batch)
         return batch
 
+    def _copy_to_device(self, batch: Any) -> Any:
+        current_stream = torch.cuda.current_stream()
+        with torch.cuda.stream(self.copy_stream):
+            batch = self._transfer_batch(batch)
+        # the batch is used on the current stream, its memory can't be re-used before the work queued there is done.
+        return apply_to_collection(batch, torch.Tensor, _record_stream, current_stream)
+
+    def wait(self) -> None:
+        if self.copy_stream is not None:
+            # the returned batch is the oldest one copied, the copies of the next ones are issued afterwards.
+            torch.cuda.current_stream().wait_stream(self.copy_stream)
+
+    def _transfer_batch(self, batch: Any) -> Any:
+        device = self.device
+        # the device is always set when coalescing, as validated in `__init__`.
+        if self.coalesce_small_tensors and device is not None:
+            batch = _coalesced_to_device(batch, device)
+        return self.batch_to_device(batch)
+
     def reset(self) -> None:
         super().reset()
-        self.batches = []
+        self.batches = deque()
+        self._next_batch = _EMPTY_SLOT
+        self._fetch_iter = None
+        if self._background_iter is not None:
+            self._background_iter.close()
+            self._background_iter = None
 
 
 class InterBatchParallelDataFetcher(DataFetcher):
@@ -290,28 +683,38 @@ class InterBatchParallelDataFetcher(DataFetcher):
         batch 2:             [HtoD]                          [forward][backward]
     """
 
+    __slots__ = ("cuda_stream", "events", "_event_pool")
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.cuda_stream = torch.cuda.Stream()
-        self.events: List[torch.cuda.Event] = []
+        self.events: Deque[torch.cuda.Event] = deque()
+        # events are re-used across batches to avoid creating a new one for every fetch.
+        self._event_pool: Deque[torch.cuda.Event] = deque(torch.cuda.Event() for _ in range(self.prefetch_batches + 1))
 
     def move_to_device(self, batch: Any) -> Any:
         with torch.cuda.stream(self.cuda_stream):
             return super().move_to_device(batch)
 
-    def on_fetch_start(self) -> "torch.cuda.Event":
-        # create a cuda event used to record the async stream of data to device.
-        return torch.cuda.Event()
-
-    def on_fetch_end(self, batch: Any, event: torch.cuda.Event) -> None:
+    def on_fetch_end(self, batch: Any, start_output: Any) -> None:
         self.batches.append(batch)
+        # the event is taken once the batch is fetched, so it isn't lost when the iterator is exhausted.
+        event = self._event_pool.popleft() if self._event_pool else torch.cuda.Event()
         event.record()
         self.events.append(event)
 
     def wait(self) -> None:
+        super().wait()
         # pop first event from the queue and wait for the batch to be available on device.
-        event = self.events.pop(0)
+        event = self.events.popleft()
         event.wait()
+        self._event_pool.append(event)
+
+    def reset(self) -> None:
+        super().reset()
+        # give back the events of the batches which weren't consumed.
+        self._event_pool.extend(self.events)
+        self.events = deque()
 
 
 class StepFuncDataLoaderIter(Iterator):
@@ -350,18 +753,48 @@ class DataLoaderIterDataFetcher(AbstractDataFetcher):
                 batch = next(dataloader_iter)
                 batch = batch.to(self.device)
                 ...
+
+    Args:
+        prefetch: Number of batches to pre-fetch from a background thread while the user consumes the
+            ``dataloader_iter``. Set it to 0 to fetch the batches on demand.
     """
 
-    def __init__(self) -> None:
+    __slots__ = ("store_on_device", "prefetch", "_background_iter", "iterator", "_output")
+
+    def __init__(self, prefetch: int = 0) -> None:
+        if prefetch < 0:
+            raise MisconfigurationException("`prefetch` should at least be 0.")
         super().__init__()
+        if prefetch and self._ft_enabled:
+            raise MisconfigurationException(
+                "`DataLoaderIterDataFetcher(prefetch>0)` isn't supported with fault tolerant training."
+            )
         self.store_on_device = False
+        self.prefetch = prefetch
+        self._background_iter: Optional[_ThreadedPrefetch] = None
+        self._output: List[Any] = [0, (None, False)]
 
     def prefetching(self) -> None:
         iterator = self.dataloader_iter
         assert iterator is not None
+        if self.prefetch:
+            # the dataloader iterator is consumed in the background, `StepFuncDataLoaderIter` still tracks the batches
+            # as the user fetches them.
+            iterator = self._background_iter = _ThreadedPrefetch(iterator, maxsize=self.prefetch)
         self.iterator = iter(StepFuncDataLoaderIter(iterator, self))
+        # `done` is always False when returned, so only the number of fetched batches changes between calls.
+        self._output[1] = (self.iterator, False)
 
-    def fetching_function(self) -> Tuple[int, Tuple[Iterator, bool]]:
+    def fetching_function(self) -> List[Any]:
         if not self.done:
-            return self.fetched, (self.iterator, self.done)
+            # the output is updated in place to avoid allocations, it should be unpacked right away.
+            output = self._output
+            output[0] = self.fetched
+            return output
         raise StopIteration
+
+    def reset(self) -> None:
+        super().reset()
+        if self._background_iter is not None:
+            self._background_iter.close()
+            self._background_iter = None
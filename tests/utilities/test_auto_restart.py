@@ -53,6 +53,7 @@ from pytorch_lightning.utilities.auto_restart import (
     CaptureIterableDataset,
     CaptureMapDataset,
     FastForwardSampler,
+    IteratorState,
     MergedIteratorState,
 )
 from pytorch_lightning.utilities.enums import _FaultTolerantMode, AutoRestartBatchKeys
@@ -792,6 +793,8 @@ def test_dataset_rng_states_restart(dataset_class, num_workers, batch_size):
         state: List[MergedIteratorState] = fetcher.state
         assert len(state) == 1
         assert isinstance(state[0], MergedIteratorState)
+        # the state is read from the patched dataloader iterator
+        assert state[0] is fetcher.dataloader_iter.state
 
         assert len(fetcher.dataloader_iter.cache_states) == 1
         if num_workers == 0:
@@ -1315,6 +1318,23 @@ def test_fault_tolerant_mode_enum():
             _FaultTolerantMode.detect_current_mode()
 
 
+@pytest.mark.parametrize("generator_name", [None, "sampler_iter"])
+def test_merged_iterator_state_snapshot(generator_name):
+    """This test ensures a snapshot isn't affected by updates made to the original ``MergedIteratorState``."""
+    state = MergedIteratorState()
+    state.update(generator_name, IteratorState(worker_id=0, num_batches_fetched=1))
+    snapshot = state.snapshot()
+    assert snapshot == state
+
+    state.update(generator_name, IteratorState(worker_id=0, num_batches_fetched=2))
+    state.update(generator_name, IteratorState(worker_id=1, num_batches_fetched=1))
+    assert snapshot != state
+    worker_states = snapshot.state if generator_name is None else snapshot.state[generator_name]
+    assert list(worker_states) == [0]
+    assert worker_states[0].num_batches_fetched == 1
+    assert snapshot.latest_worker_id == 0
+
+
 class StatefulRandomSampler(RandomSampler):
 
     counter = 0
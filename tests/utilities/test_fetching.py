@@ -11,11 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import dataclasses
 import os
 from time import time
 from typing import Any, Iterator
 from unittest import mock
 
+import numpy as np
 import pytest
 import torch
 from torch import tensor
@@ -23,15 +25,25 @@ from torch.utils.data import DataLoader, Dataset, IterableDataset
 
 from pytorch_lightning import Callback, LightningDataModule, Trainer
 from pytorch_lightning.trainer.supporters import CombinedLoader
+from pytorch_lightning.utilities.apply_func import apply_to_collection
 from pytorch_lightning.utilities.exceptions import MisconfigurationException
-from pytorch_lightning.utilities.fetching import DataFetcher, DataLoaderIterDataFetcher, InterBatchParallelDataFetcher
+from pytorch_lightning.utilities.fetching import (
+    _coalesced_to_device,
+    _collect_tensors,
+    _flat_loader_iter_pairs,
+    _ThreadedPrefetch,
+    DataFetcher,
+    DataLoaderIterDataFetcher,
+    InterBatchParallelDataFetcher,
+)
 from pytorch_lightning.utilities.types import STEP_OUTPUT
 from tests.helpers import BoringModel, RandomDataset
 from tests.helpers.runif import RunIf
 
 
+@pytest.mark.parametrize("background", [False, True])
 @pytest.mark.parametrize("use_combined_loader", [False, True])
-def test_prefetch_iterator(use_combined_loader):
+def test_prefetch_iterator(use_combined_loader, background):
     """Test the DataFetcher with PyTorch IterableDataset."""
 
     class IterDataset(IterableDataset):
@@ -51,7 +63,7 @@ def test_prefetch_iterator(use_combined_loader):
         else:
             loader = DataLoader(IterDataset())
             expected = [(1, False), (2, False), (3, True)]
-        iterator = DataFetcher(prefetch_batches=prefetch_batches)
+        iterator = DataFetcher(prefetch_batches=prefetch_batches, background=background)
         assert iterator.prefetch_batches == prefetch_batches
         iterator.setup(loader)
 
@@ -66,17 +78,83 @@ def test_prefetch_iterator(use_combined_loader):
         # validate reset works properly.
         assert generate() == expected
         assert iterator.fetched == 3
+        iterator.teardown()
+        assert iterator._background_iter is None
 
     class EmptyIterDataset(IterableDataset):
         def __iter__(self):
             return iter([])
 
     dataloader = DataLoader(EmptyIterDataset())
-    iterator = DataFetcher()
+    iterator = DataFetcher(background=background)
     iterator.setup(dataloader)
     assert not list(iterator)
 
 
+def test_data_fetcher_single_slot():
+    """Test the pre-fetched batch is stored in a single slot only for the ``DataFetcher`` itself, subclasses
+    relying on the ``batches`` queue."""
+
+    class CustomDataFetcher(DataFetcher):
+        def on_fetch_end(self, batch, start_output):
+            self.batches.append(batch * 2)
+
+    class PrefetchingDataFetcher(DataFetcher):
+        def prefetching(self):
+            super().prefetching()
+            self.prefetched = list(self.batches)
+
+    fetcher = DataFetcher()
+    assert fetcher._single_slot
+    assert not DataFetcher(prefetch_batches=2)._single_slot
+
+    fetcher = CustomDataFetcher()
+    assert not fetcher._single_slot
+    fetcher.setup(DataLoader(range(3)))
+    assert list(fetcher) == [(tensor([0]), False), (tensor([2]), False), (tensor([4]), True)]
+
+    fetcher = PrefetchingDataFetcher()
+    assert not fetcher._single_slot
+    fetcher.setup(DataLoader(range(3)))
+    assert list(fetcher) == [(tensor([0]), False), (tensor([1]), False), (tensor([2]), True)]
+    assert fetcher.prefetched == [tensor([0])]
+
+
+def test_data_fetcher_background_exception():
+    """Test an exception raised by the dataloader in the background thread is re-raised when fetching."""
+
+    class FailingIterDataset(IterableDataset):
+        def __iter__(self):
+            yield 1
+            yield 2
+            raise RuntimeError("failed to load")
+
+    fetcher = DataFetcher(background=True)
+    fetcher.setup(DataLoader(FailingIterDataset()))
+    iterator = iter(fetcher)
+    assert next(iterator) == (tensor([1]), False)
+    with pytest.raises(RuntimeError, match="failed to load"):
+        next(iterator)
+    fetcher.teardown()
+    assert fetcher._background_iter is None
+
+
+def test_threaded_prefetch_close():
+    """Test the background iterator stops once closed, instead of blocking on its empty queue."""
+    iterator = _ThreadedPrefetch(iter(range(10)), maxsize=2)
+    assert next(iterator) == 0
+    iterator.close()
+    assert not iterator._thread.is_alive()
+    with pytest.raises(StopIteration):
+        next(iterator)
+
+
+@mock.patch.dict(os.environ, {"PL_FAULT_TOLERANT_TRAINING": "1"})
+def test_data_fetcher_background_fault_tolerant():
+    with pytest.raises(MisconfigurationException, match="isn't supported with fault tolerant training"):
+        DataFetcher(background=True)
+
+
 def test_misconfiguration_error():
 
     fetcher = DataFetcher()
@@ -92,6 +170,239 @@ def test_misconfiguration_error():
     assert fetcher.loader_iters
 
 
+def test_data_fetcher_loaders_cache():
+    """Test the ``loaders`` and ``loader_iters`` are cached and refreshed for each new iterator."""
+    fetcher = DataFetcher()
+    fetcher.setup(DataLoader(range(10)))
+    assert fetcher.loaders is fetcher.loaders
+
+    iter(fetcher)
+    loader_iters = fetcher.loader_iters
+    assert loader_iters is fetcher.loader_iters
+
+    # a new iterator is created for each epoch
+    iter(fetcher)
+    assert fetcher.loader_iters is not loader_iters
+    assert fetcher.loader_iters[0] is fetcher.dataloader_iter
+
+
+@pytest.mark.parametrize("use_combined_loader", [False, True])
+def test_data_fetcher_state_without_fault_tolerant(use_combined_loader):
+    """Test the ``state`` raises the same way for any dataloader when fault tolerant training is disabled, and
+    isn't available once the ``DataFetcher`` has been torn down."""
+    dataloader = DataLoader(range(10))
+    if use_combined_loader:
+        dataloader = CombinedLoader(dataloader)
+    fetcher = DataFetcher()
+    fetcher.setup(dataloader)
+    iter(fetcher)
+    with pytest.raises(MisconfigurationException, match="only available with fault tolerant training"):
+        fetcher.state
+    fetcher.teardown()
+    with pytest.raises(MisconfigurationException, match="The `dataloader_iter` isn't available outside"):
+        fetcher.state
+
+
+@RunIf(min_gpus=1)
+def test_data_fetcher_copy_stream():
+    """Test the ``DataFetcher`` moves the batches to device on its own CUDA stream."""
+    fetcher = DataFetcher(use_copy_stream=True)
+    assert isinstance(fetcher.copy_stream, torch.cuda.Stream)
+    streams = []
+
+    def batch_to_device(batch):
+        streams.append(torch.cuda.current_stream())
+        return batch.cuda()
+
+    fetcher.setup(DataLoader(range(3)), batch_to_device=batch_to_device)
+    batches = [batch for batch, _ in fetcher]
+    assert all(batch.is_cuda for batch in batches)
+    assert torch.equal(torch.cat(batches).cpu(), torch.arange(3))
+    assert all(stream == fetcher.copy_stream for stream in streams)
+
+    assert DataFetcher(use_copy_stream=True, store_on_device=False).copy_stream is None
+
+
+@RunIf(min_gpus=1)
+def test_data_fetcher_copy_stream_ordering():
+    """Test the copy of the next batch doesn't wait for the work queued on the current stream, while the current
+    stream waits for the copy of the returned batch."""
+    cycles_per_ms = get_cycles_per_ms()
+    fetcher = DataFetcher(use_copy_stream=True)
+    fetcher.setup(DataLoader(range(4), pin_memory=True), batch_to_device=lambda batch: batch.cuda(non_blocking=True))
+
+    # the copy of the first batch is queued behind the sleep on the copy stream
+    with torch.cuda.stream(fetcher.copy_stream):
+        torch.cuda._sleep(int(100 * cycles_per_ms))
+    iterator = iter(fetcher)
+    batch, _ = next(iterator)
+    assert not torch.cuda.current_stream().query()
+    torch.cuda.synchronize()
+    assert torch.equal(batch.cpu(), tensor([0]))
+
+    # the copy of the next batch is issued while the current stream is still busy
+    torch.cuda._sleep(int(100 * cycles_per_ms))
+    batch, _ = next(iterator)
+    fetcher.copy_stream.synchronize()
+    assert not torch.cuda.current_stream().query()
+    torch.cuda.synchronize()
+    assert torch.equal(batch.cpu(), tensor([1]))
+
+
+@RunIf(min_gpus=1)
+def test_inter_batch_parallel_data_fetcher_reuses_events():
+    """Test the ``InterBatchParallelDataFetcher`` re-uses its pre-allocated CUDA events."""
+    fetcher = InterBatchParallelDataFetcher()
+    events = set(fetcher._event_pool)
+    assert len(events) == fetcher.prefetch_batches + 1
+
+    fetcher.setup(DataLoader(range(8)))
+    for _ in range(2):
+        assert len(list(fetcher)) == 8
+        assert set(fetcher._event_pool) == events
+        assert not fetcher.events
+
+    fetcher.setup(DataLoader([]))
+    assert not list(fetcher)
+    assert set(fetcher._event_pool) == events
+
+
+def test_flat_loader_iter_pairs():
+    """Test the loaders are paired with their iterators only for flat collections."""
+    loader_a, loader_b = DataLoader(range(2)), DataLoader(range(3))
+    iter_a, iter_b = iter(loader_a), iter(loader_b)
+    assert _flat_loader_iter_pairs([loader_a, loader_b], [iter_a, iter_b]) == [(loader_a, iter_a), (loader_b, iter_b)]
+    assert _flat_loader_iter_pairs({"a": loader_a, "b": loader_b}, {"b": iter_b, "a": iter_a}) == [
+        (loader_a, iter_a),
+        (loader_b, iter_b),
+    ]
+    assert _flat_loader_iter_pairs(loader_a, iter_a) == [(loader_a, iter_a)]
+    # nested collections require the generic traversal
+    assert _flat_loader_iter_pairs({"a": [loader_a, loader_b]}, {"a": [iter_a, iter_b]}) is None
+
+
+@RunIf(min_gpus=1)
+def test_coalesced_to_device():
+    """Test the tensors of a small batch are moved to device through a single buffer."""
+    device = torch.device("cuda", 0)
+    batch = {"x": torch.rand(2, 3), "y": [torch.arange(4.0), torch.tensor(1.0)]}
+    moved = _coalesced_to_device(batch, device)
+    assert moved["x"].is_cuda and moved["y"][0].is_cuda and moved["y"][1].is_cuda
+    assert torch.equal(moved["x"].cpu(), batch["x"])
+    assert torch.equal(moved["y"][0].cpu(), batch["y"][0])
+    assert torch.equal(moved["y"][1].cpu(), batch["y"][1])
+    # all the tensors are views of the same buffer
+    assert moved["x"].storage().data_ptr() == moved["y"][1].storage().data_ptr()
+
+    # tensors of different dtypes aren't coalesced
+    batch = [torch.rand(2), torch.arange(2)]
+    assert _coalesced_to_device(batch, device) is batch
+
+    fetcher = DataFetcher(coalesce_small_tensors=True, device=device)
+    fetcher.setup(DataLoader([(torch.rand(2), torch.rand(3))] * 2))
+    assert all(t.is_cuda for batch, _ in fetcher for t in batch)
+
+
+def test_collect_tensors():
+    """Test the tensors are collected in the order ``apply_to_collection`` maps them, so the coalesced chunks can
+    replace them."""
+
+    @dataclasses.dataclass
+    class Batch:
+        x: torch.Tensor
+        y: torch.Tensor = dataclasses.field(init=False)
+
+    data = Batch(torch.rand(1))
+    data.y = torch.rand(2)
+    batch = {"a": [torch.rand(3), (torch.rand(4), "name")], "b": data}
+    tensors = []
+    _collect_tensors(batch, tensors)
+    expected = []
+    apply_to_collection(batch, torch.Tensor, lambda t: expected.append(t) or t)
+    assert [id(t) for t in tensors] == [id(t) for t in expected]
+    assert len(tensors) == 3
+
+
+def test_coalesced_to_device_cpu():
+    """Test the tensors aren't coalesced when the target device is the CPU."""
+    batch = {"x": torch.rand(2, 3), "y": torch.rand(4)}
+    assert _coalesced_to_device(batch, torch.device("cpu")) is batch
+
+    with pytest.raises(MisconfigurationException, match="requires a `device`"):
+        DataFetcher(coalesce_small_tensors=True)
+
+
+@RunIf(min_gpus=1)
+@pytest.mark.parametrize("background", [False, True])
+def test_data_fetcher_pin_memory(background):
+    """Test the ``DataFetcher`` pins the fetched batches when the dataloader doesn't."""
+    fetcher = DataFetcher(pin_memory=True, background=background)
+    fetcher.setup(DataLoader([(torch.rand(2), torch.rand(3))] * 2, pin_memory=False))
+    assert all(t.is_pinned() for batch, _ in fetcher for t in batch)
+
+
+@RunIf(min_torch="2.0.0")
+def test_data_fetcher_compile_batch_to_device():
+    """Test the ``DataFetcher`` compiles the provided ``batch_to_device``."""
+    fetcher = DataFetcher(compile_batch_to_device=True)
+
+    def batch_to_device(batch):
+        return batch * 2
+
+    fetcher.setup(DataLoader(range(3)), batch_to_device=batch_to_device)
+    assert fetcher.batch_to_device is not batch_to_device
+    assert [batch.item() for batch, _ in fetcher] == [0, 2, 4]
+
+
+@RunIf(max_torch="2.0.0")
+def test_data_fetcher_compile_batch_to_device_unavailable():
+    with pytest.raises(MisconfigurationException, match="requires PyTorch 2.0 or later"):
+        DataFetcher(compile_batch_to_device=True)
+
+
+class MmapDataset(Dataset):
+    def __init__(self, length: int) -> None:
+        self.data = np.arange(length * 2, dtype=np.float32).reshape(length, 2)
+
+    def __getitem__(self, index):
+        raise AssertionError("The batches should be fetched with `__mmap_batch__`")
+
+    def __mmap_batch__(self, indices):
+        return {"x": self.data[indices]}
+
+    def __len__(self):
+        return len(self.data)
+
+
+def test_data_fetcher_mmap_batches():
+    """Test the ``DataFetcher`` fetches the batches with ``__mmap_batch__`` when the dataset implements it."""
+    dataset = MmapDataset(5)
+    fetcher = DataFetcher()
+    fetcher.setup(DataLoader(dataset, batch_size=2))
+    batches = [batch for batch, _ in fetcher]
+    assert len(batches) == 3
+    assert torch.equal(torch.cat([batch["x"] for batch in batches]), torch.from_numpy(dataset.data))
+
+    # the trainer wraps the training dataloader into a `CombinedLoader`
+    fetcher.setup(CombinedLoader(DataLoader(dataset, batch_size=2)))
+    assert fetcher._mmap_dataloader is fetcher.dataloader.loaders
+    batches = [batch for batch, _ in fetcher]
+    assert len(batches) == 3
+
+    # workers require the batches to go through the dataloader iterator
+    fetcher.setup(DataLoader(dataset, batch_size=2, num_workers=1))
+    assert fetcher._mmap_dataloader is None
+
+    class MmapIterableDataset(IterableDataset):
+        __mmap_batch__ = MmapDataset.__mmap_batch__
+
+        def __iter__(self):
+            yield from range(2)
+
+    fetcher.setup(DataLoader(MmapIterableDataset(), batch_size=2))
+    assert fetcher._mmap_dataloader is None
+
+
 def get_cycles_per_ms() -> float:
     """Get 10 values and remove the 2 max and 2 min and return the avg.
 
@@ -259,6 +570,21 @@ def test_fetching_dataloader_iter(automatic_optimization, tmpdir):
     trainer.fit(model)
 
 
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_dataloader_iter_data_fetcher_prefetch(prefetch):
+    """Test the ``DataLoaderIterDataFetcher`` yields all the batches when pre-fetching them in the background."""
+    fetcher = DataLoaderIterDataFetcher(prefetch=prefetch)
+    fetcher.setup(DataLoader(range(4)))
+    for _ in range(2):
+        batches = []
+        for _, (dataloader_iter, _) in fetcher:
+            batches.extend(dataloader_iter)
+        assert torch.equal(torch.cat(batches), torch.arange(4))
+        assert fetcher.fetched == 4
+    fetcher.teardown()
+    assert fetcher._background_iter is None
+
+
 class DummyWaitable:
     def __init__(self, val: Any) -> None:
         self.val = val